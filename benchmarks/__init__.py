@@ -0,0 +1,3 @@
+"""
+Herramientas de medición de rendimiento.
+"""
@@ -0,0 +1,567 @@
+"""
+Generador de carga para el endpoint /api/v1/convert.
+
+Arranca la aplicación con uvicorn en un subproceso (o usa una URL externa),
+envía peticiones concurrentes con una mezcla configurable de
+tamaños, formatos de imagen, planes de preprocesamiento y formatos de salida,
+y reporta RPS, percentiles de latencia, tasa de errores, retraso del event
+loop del servidor y RSS a lo largo del tiempo. Termina con código 1 si se
+supera alguno de los umbrales configurados.
+
+Uso:
+    python -m benchmarks.load_test --duration 30 --concurrency 16 \\
+        --sizes 64x64:3,512x512:1 --preprocess "grayscale;grayscale,resize_64x64" \\
+        --max-p95-ms 250 --max-error-rate 0.01
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+from PIL import Image
+
+# Ruta de la sonda que el servidor de prueba añade a la aplicación
+PROBE_PATH = "/__loadtest/probe"
+
+# Formatos de imagen soportados: extensión -> (formato de Pillow, tipo MIME)
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpg": ("JPEG", "image/jpeg"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "bmp": ("BMP", "image/bmp"),
+    "tiff": ("TIFF", "image/tiff"),
+}
+
+
+@dataclass
+class Weighted:
+    """Valor con peso para la selección aleatoria de la mezcla de tráfico."""
+    value: Any
+    weight: float = 1.0
+
+
+@dataclass
+class TrafficMix:
+    """Mezcla de tráfico sintético."""
+    sizes: List[Weighted]
+    image_formats: List[Weighted]
+    preprocess: List[Weighted]
+    output_formats: List[Weighted]
+    variants: int = 4
+
+
+@dataclass
+class Thresholds:
+    """Umbrales de regresión (None desactiva la comprobación)."""
+    min_rps: Optional[float] = None
+    max_p50_ms: Optional[float] = None
+    max_p95_ms: Optional[float] = None
+    max_p99_ms: Optional[float] = None
+    max_error_rate: Optional[float] = None
+    max_loop_lag_ms: Optional[float] = None
+    max_rss_growth_mb: Optional[float] = None
+
+
+@dataclass
+class RunStats:
+    """Resultados acumulados durante la ejecución."""
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    timeline: List[Dict[str, float]] = field(default_factory=list)
+    loop_lags: List[float] = field(default_factory=list)
+
+
+def parse_weighted(spec: str, convert=str) -> List[Weighted]:
+    """
+    Interpreta una lista con pesos opcionales: "a:3,b:1" o "a,b".
+
+    Args:
+        spec: Especificación separada por comas
+        convert: Función para convertir cada valor
+
+    Returns:
+        Lista de valores con peso
+    """
+    items = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        value, _, weight = part.partition(":")
+        items.append(Weighted(convert(value), float(weight) if weight else 1.0))
+    if not items:
+        raise ValueError(f"Especificación vacía: {spec!r}")
+    return items
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    """Convierte "WxH" en una tupla (ancho, alto)."""
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def parse_preprocess(spec: str) -> List[Weighted]:
+    """
+    Interpreta planes de preprocesamiento separados por ";".
+
+    Cada plan es una lista de operaciones separadas por comas con un peso
+    opcional tras "|", por ejemplo "grayscale|3;grayscale,resize_64x64;".
+    Un plan vacío envía la petición sin preprocesamiento.
+    """
+    plans = []
+    for part in spec.split(";"):
+        plan, _, weight = part.strip().partition("|")
+        operations = [op.strip() for op in plan.split(",") if op.strip()]
+        plans.append(Weighted(operations, float(weight) if weight else 1.0))
+    return plans
+
+
+def choose(rng: random.Random, items: Sequence[Weighted]) -> Any:
+    """Selecciona un valor según su peso."""
+    return rng.choices([item.value for item in items], weights=[item.weight for item in items])[0]
+
+
+def build_payloads(mix: TrafficMix, seed: int) -> Dict[Tuple[Tuple[int, int], str], List[bytes]]:
+    """
+    Genera por adelantado las imágenes codificadas de la mezcla.
+
+    Se crean varias variantes por combinación de tamaño y formato para que
+    las cachés del servicio no conviertan todas las peticiones en aciertos.
+    """
+    rng = np.random.default_rng(seed)
+    payloads = {}
+    for size in mix.sizes:
+        for image_format in mix.image_formats:
+            pil_format = IMAGE_FORMATS[image_format.value][0]
+            encoded = []
+            for _ in range(max(mix.variants, 1)):
+                width, height = size.value
+                pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+                buffer = io.BytesIO()
+                Image.fromarray(pixels).save(buffer, pil_format)
+                encoded.append(buffer.getvalue())
+            payloads[(size.value, image_format.value)] = encoded
+    return payloads
+
+
+def read_rss_mb() -> float:
+    """
+    Devuelve el RSS actual del proceso en MB.
+
+    Usa /proc cuando está disponible y, si no, el pico de RSS de getrusage.
+    En plataformas sin ninguno de los dos (Windows) devuelve 0.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS devuelve bytes; Linux devuelve KB
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentil q de una lista (0 si está vacía)."""
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+async def monitor_loop_lag(interval: float, samples: List[float]) -> None:
+    """Registra cuánto se retrasa el despertar de un sleep periódico."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - start - interval
+        samples.append(max(lag, 0.0) * 1000)
+
+
+def serve(port: int, lag_interval: float) -> None:
+    """
+    Ejecuta la aplicación con uvicorn midiendo el retraso de su event loop.
+
+    Se usa en el subproceso que arranca `LocalServer`. La sonda PROBE_PATH
+    devuelve (y vacía) las muestras de retraso junto con el RSS del propio
+    servidor.
+    """
+    import uvicorn
+    from src.api.app import app
+
+    samples: List[float] = []
+
+    @app.get(PROBE_PATH, include_in_schema=False)
+    async def probe():
+        lags = samples[:]
+        samples.clear()
+        return {"lags_ms": lags, "rss_mb": read_rss_mb()}
+
+    async def run() -> None:
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        monitor = asyncio.ensure_future(monitor_loop_lag(lag_interval, samples))
+        try:
+            await server.serve()
+        finally:
+            monitor.cancel()
+
+    asyncio.run(run())
+
+
+class LocalServer:
+    """
+    Arranca la aplicación en un subproceso para que las métricas del
+    servidor no incluyan el trabajo del generador de carga.
+    """
+    def __init__(self, port: int, lag_interval: float, log_level: str):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.command = [
+            sys.executable, "-m", "benchmarks.load_test",
+            "--serve-port", str(port),
+            "--lag-interval", str(lag_interval),
+            "--log-level", log_level,
+        ]
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 20.0) -> None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(self.command, cwd=root)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        self.stop()
+        raise RuntimeError("No se pudo iniciar el servidor local")
+
+    def stop(self) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def free_port() -> int:
+    """Obtiene un puerto TCP libre en localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_load(
+    url: str,
+    api_key_header: str,
+    api_key: str,
+    mix: TrafficMix,
+    stats: RunStats,
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int],
+    sample_interval: float,
+    seed: int,
+    track_server: bool
+) -> float:
+    """
+    Envía peticiones concurrentes hasta agotar la duración o el número de
+    peticiones.
+
+    Returns:
+        Tiempo total transcurrido en segundos
+    """
+    payloads = build_payloads(mix, seed)
+    headers = {api_key_header: api_key}
+    sent = 0
+    last_sample = (0.0, 0)
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def next_request(rng: random.Random) -> Optional[Tuple[Dict, Dict]]:
+        nonlocal sent
+        if time.perf_counter() >= deadline or (max_requests is not None and sent >= max_requests):
+            return None
+        sent += 1
+        size = choose(rng, mix.sizes)
+        image_format = choose(rng, mix.image_formats)
+        content = rng.choice(payloads[(size, image_format)])
+        files = {"image": (f"load.{image_format}", content, IMAGE_FORMATS[image_format][1])}
+        data = {"format": choose(rng, mix.output_formats)}
+        plan = choose(rng, mix.preprocess)
+        if plan:
+            data["preprocess"] = plan
+        return files, data
+
+    async def worker(index: int, client: httpx.AsyncClient) -> None:
+        rng = random.Random(seed + index)
+        while True:
+            request = next_request(rng)
+            if request is None:
+                return
+            files, data = request
+            t0 = time.perf_counter()
+            try:
+                response = await client.post("/api/v1/convert", files=files, data=data, headers=headers)
+                await response.aread()
+                code = str(response.status_code)
+                if response.status_code >= 400:
+                    stats.errors += 1
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+                stats.errors += 1
+            stats.latencies.append((time.perf_counter() - t0) * 1000)
+            stats.status_codes[code] = stats.status_codes.get(code, 0) + 1
+
+    async def probe_server(client: httpx.AsyncClient, under_load: bool = True) -> Optional[Dict[str, Any]]:
+        """Recoge las muestras de retraso y el RSS del servidor."""
+        try:
+            response = await client.get(PROBE_PATH)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return None
+        result = response.json()
+        # Las muestras previas a la carga (arranque, reposo) no se agregan
+        if under_load:
+            stats.loop_lags.extend(result["lags_ms"])
+        return result
+
+    async def record_sample(client: httpx.AsyncClient, under_load: bool = True) -> None:
+        """Añade un punto a la serie temporal con el RPS desde el anterior."""
+        nonlocal last_sample
+        t = time.perf_counter() - start
+        completed = len(stats.latencies)
+        previous_t, previous_completed = last_sample
+        sample = {
+            "t": round(t, 3),
+            "rps": round((completed - previous_completed) / (t - previous_t), 2) if t > previous_t else 0.0,
+            "completed": completed,
+            "errors": stats.errors,
+        }
+        if track_server:
+            probe = await probe_server(client, under_load)
+            if probe is not None:
+                sample["rss_mb"] = round(probe["rss_mb"], 2)
+                lags = probe["lags_ms"]
+                if under_load:
+                    sample["loop_lag_max_ms"] = round(max(lags), 3) if lags else 0.0
+        stats.timeline.append(sample)
+        last_sample = (t, completed)
+
+    async def sampler(client: httpx.AsyncClient) -> None:
+        while True:
+            await asyncio.sleep(sample_interval)
+            await record_sample(client)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        # La sonda usa su propio cliente para no esperar a un hueco en el pool
+        async with httpx.AsyncClient(base_url=url, timeout=10.0) as probe_client:
+            # Muestra de referencia (RSS en reposo) antes de iniciar la carga
+            await record_sample(probe_client, under_load=False)
+            sampling = asyncio.ensure_future(sampler(probe_client))
+            await asyncio.gather(*(worker(i, client) for i in range(concurrency)))
+            sampling.cancel()
+            elapsed = time.perf_counter() - start
+            # Muestra final, con las peticiones completadas tras la última muestra
+            await record_sample(probe_client)
+
+    return elapsed
+
+
+def summarize(stats: RunStats, elapsed: float, track_server: bool) -> Dict[str, Any]:
+    """Calcula las métricas agregadas de la ejecución."""
+    total = len(stats.latencies)
+    summary = {
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "rps": total / elapsed if elapsed > 0 else 0.0,
+        "error_rate": stats.errors / total if total else 0.0,
+        "status_codes": stats.status_codes,
+        "latency_ms": {
+            "p50": percentile(stats.latencies, 50),
+            "p95": percentile(stats.latencies, 95),
+            "p99": percentile(stats.latencies, 99),
+            "max": max(stats.latencies) if stats.latencies else 0.0,
+        },
+        "timeline": stats.timeline,
+    }
+    if track_server:
+        rss = [sample["rss_mb"] for sample in stats.timeline if "rss_mb" in sample]
+        summary["loop_lag_ms"] = {
+            "p50": percentile(stats.loop_lags, 50),
+            "p99": percentile(stats.loop_lags, 99),
+            "max": max(stats.loop_lags) if stats.loop_lags else 0.0,
+        }
+        summary["rss_mb"] = {
+            "start": rss[0] if rss else 0.0,
+            "end": rss[-1] if rss else 0.0,
+            "growth": rss[-1] - rss[0] if rss else 0.0,
+        }
+    return summary
+
+
+def check_thresholds(summary: Dict[str, Any], thresholds: Thresholds) -> List[str]:
+    """
+    Compara el resumen con los umbrales configurados.
+
+    Returns:
+        Lista de mensajes con los umbrales superados (vacía si no hay regresión)
+    """
+    checks = [
+        ("RPS", summary["rps"], thresholds.min_rps, False),
+        ("p50 (ms)", summary["latency_ms"]["p50"], thresholds.max_p50_ms, True),
+        ("p95 (ms)", summary["latency_ms"]["p95"], thresholds.max_p95_ms, True),
+        ("p99 (ms)", summary["latency_ms"]["p99"], thresholds.max_p99_ms, True),
+        ("Tasa de errores", summary["error_rate"], thresholds.max_error_rate, True),
+    ]
+    if "loop_lag_ms" in summary:
+        checks.append(("Retraso del event loop (ms)", summary["loop_lag_ms"]["max"], thresholds.max_loop_lag_ms, True))
+    if "rss_mb" in summary:
+        checks.append(("Crecimiento de RSS (MB)", summary["rss_mb"]["growth"], thresholds.max_rss_growth_mb, True))
+
+    failures = []
+    for name, value, limit, is_max in checks:
+        if limit is None:
+            continue
+        if (is_max and value > limit) or (not is_max and value < limit):
+            relation = ">" if is_max else "<"
+            failures.append(f"{name}: {value:.3f} {relation} {limit}")
+    return failures
+
+
+def print_report(summary: Dict[str, Any], failures: List[str]) -> None:
+    """Muestra el resumen en formato legible."""
+    latency = summary["latency_ms"]
+    print(f"Peticiones: {summary['requests']} en {summary['elapsed_s']}s ({summary['rps']:.1f} RPS)")
+    print(f"Latencia (ms): p50={latency['p50']:.1f} p95={latency['p95']:.1f} "
+          f"p99={latency['p99']:.1f} max={latency['max']:.1f}")
+    print(f"Tasa de errores: {summary['error_rate']:.2%} {summary['status_codes']}")
+    if "loop_lag_ms" in summary:
+        lag = summary["loop_lag_ms"]
+        print(f"Retraso del event loop (ms): p50={lag['p50']:.2f} p99={lag['p99']:.2f} max={lag['max']:.2f}")
+        rss = summary["rss_mb"]
+        print(f"RSS (MB): inicio={rss['start']:.1f} fin={rss['end']:.1f} crecimiento={rss['growth']:.1f}")
+    print("Serie temporal:")
+    for sample in summary["timeline"]:
+        print("  " + " ".join(f"{key}={value}" for key, value in sample.items()))
+    if failures:
+        print("REGRESIÓN: umbrales superados:")
+        for failure in failures:
+            print(f"  - {failure}")
+    else:
+        print("Todos los umbrales se cumplen")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Prueba de carga para /api/v1/convert")
+    parser.add_argument("--url", help="URL de un servidor ya iniciado (por defecto se arranca uno local)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Peticiones simultáneas")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duración máxima en segundos")
+    parser.add_argument("--requests", type=int, help="Número máximo de peticiones")
+    parser.add_argument("--sizes", default="64x64:3,256x256:2,1024x1024:1", help="Tamaños WxH con peso opcional")
+    parser.add_argument("--image-formats", default="png:2,jpg:1", help="Formatos de imagen con peso opcional")
+    parser.add_argument("--preprocess", default=";grayscale;grayscale,resize_64x64;resize_224x224,normalize",
+                        help="Planes separados por ';' (operaciones por ',', peso opcional tras '|')")
+    parser.add_argument("--output-formats", default="json:1,numpy:1", help="Formatos de salida con peso opcional")
+    parser.add_argument("--variants", type=int, default=4, help="Variantes de imagen por tamaño y formato")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Intervalo de la serie temporal (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level",
+                        help="Nivel de log durante la prueba (por defecto LOG_LEVEL de la configuración)")
+    parser.add_argument("--lag-interval", type=float, default=0.01,
+                        help="Periodo (s) de la sonda de retraso del event loop del servidor")
+    parser.add_argument("--serve-port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--json-out", help="Archivo donde guardar el resumen en JSON")
+    parser.add_argument("--min-rps", type=float)
+    parser.add_argument("--max-p50-ms", type=float)
+    parser.add_argument("--max-p95-ms", type=float)
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--max-loop-lag-ms", type=float)
+    parser.add_argument("--max-rss-growth-mb", type=float)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la prueba de carga."""
+    from src.config.settings import get_settings
+    settings = get_settings()
+
+    args = build_parser().parse_args(argv)
+    args.log_level = args.log_level or settings.LOG_LEVEL
+    logging.getLogger().setLevel(args.log_level.upper())
+    logging.getLogger("src.api.middlewares.logging_middleware").setLevel(args.log_level.upper())
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.serve_port is not None:
+        serve(args.serve_port, args.lag_interval)
+        return 0
+
+    mix = TrafficMix(
+        sizes=parse_weighted(args.sizes, parse_size),
+        image_formats=parse_weighted(args.image_formats, lambda value: value.lower()),
+        preprocess=parse_preprocess(args.preprocess),
+        output_formats=parse_weighted(args.output_formats),
+        variants=args.variants,
+    )
+    thresholds = Thresholds(
+        min_rps=args.min_rps,
+        max_p50_ms=args.max_p50_ms,
+        max_p95_ms=args.max_p95_ms,
+        max_p99_ms=args.max_p99_ms,
+        max_error_rate=args.max_error_rate,
+        max_loop_lag_ms=args.max_loop_lag_ms,
+        max_rss_growth_mb=args.max_rss_growth_mb,
+    )
+
+    stats = RunStats()
+    server = None
+    url = args.url
+    if url is None:
+        server = LocalServer(free_port(), args.lag_interval, args.log_level)
+        server.start()
+        url = server.url
+
+    try:
+        elapsed = asyncio.run(run_load(
+            url, settings.API_KEY_HEADER, settings.DEFAULT_API_KEY, mix, stats,
+            args.concurrency, args.duration, args.requests, args.sample_interval,
+            args.seed, track_server=server is not None,
+        ))
+    finally:
+        if server is not None:
+            server.stop()
+
+    summary = summarize(stats, elapsed, track_server=server is not None)
+    failures = check_thresholds(summary, thresholds)
+    print_report(summary, failures)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as output:
+            json.dump({**summary, "failures": failures}, output, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Comparativa del motor de redimensionamiento con las implementaciones previas.
+
+Mide, para cada combinación de tamaño de origen y destino, el tiempo medio
+de:
+- Pillow con LANCZOS (camino previo de `_apply_preprocessing`)
+- OpenCV con INTER_AREA (camino previo de `ImageProcessingUtils.resize_image`)
+- `ResizeEngine.resize_image` con cada filtro
+- `ResizeEngine.resize_image` con LANCZOS y `RESIZE_REDUCING_GAP=2.0`
+- `ResizeEngine.resize_array` con cada filtro (OpenCV, con reducción previa
+  por bloques en las reducciones de 2x o más)
+
+Uso:
+    python -m benchmarks.resize_benchmark --sources 1024x768,2048x2048 --targets 64x64,224x224,512x512
+"""
+import argparse
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.config.settings import get_settings
+from src.utils.resize import FILTERS, ResizeEngine
+
+
+def parse_sizes(spec: str) -> List[Tuple[int, int]]:
+    """Convierte "WxH,WxH" en una lista de tuplas (ancho, alto)."""
+    sizes = []
+    for part in spec.split(","):
+        width, height = part.strip().lower().split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    """Tiempo medio en milisegundos tras una ejecución de calentamiento."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure_with_gap(fn: Callable[[], object], repeat: int, gap: float) -> float:
+    """Mide `fn` con RESIZE_REDUCING_GAP fijado temporalmente a `gap`."""
+    settings = get_settings()
+    previous = settings.RESIZE_REDUCING_GAP
+    settings.RESIZE_REDUCING_GAP = gap
+    try:
+        return measure(fn, repeat)
+    finally:
+        settings.RESIZE_REDUCING_GAP = previous
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de redimensionamiento")
+    parser.add_argument("--sources", default="640x480,1024x768,1024x1024,2048x2048")
+    parser.add_argument("--targets", default="64x64,224x224,512x512")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    columns = (
+        ["pil_lanczos", "cv2_area"]
+        + [f"engine_{name}" for name in FILTERS]
+        + ["engine_lanczos_gap2"]
+        + [f"engine_array_{name}" for name in FILTERS]
+    )
+    print(f"{'origen':>10} {'destino':>8} " + " ".join(f"{column:>19}" for column in columns) + "  (ms)")
+
+    for source in parse_sizes(args.sources):
+        array = rng.integers(0, 256, size=(source[1], source[0], 3), dtype=np.uint8)
+        img = Image.fromarray(array)
+        for target in parse_sizes(args.targets):
+            timings = [
+                measure(lambda: np.array(img.resize(target, Image.LANCZOS)), args.repeat),
+                measure(lambda: cv2.resize(array, target, interpolation=cv2.INTER_AREA), args.repeat),
+            ]
+            for name in FILTERS:
+                timings.append(measure(
+                    lambda: np.array(ResizeEngine.resize_image(img, target, name)), args.repeat
+                ))
+            timings.append(measure_with_gap(
+                lambda: np.array(ResizeEngine.resize_image(img, target, "lanczos")), args.repeat, 2.0
+            ))
+            for name in FILTERS:
+                timings.append(measure(lambda: ResizeEngine.resize_array(array, target, name), args.repeat))
+            source_label = f"{source[0]}x{source[1]}"
+            target_label = f"{target[0]}x{target[1]}"
+            print(f"{source_label:>10} {target_label:>8} " + " ".join(f"{value:>19.2f}" for value in timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,13 @@
 Controlador para la conversión de imágenes a matrices.
 """
 from fastapi import UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from typing import Optional, List
 import numpy as np
 import io
 
 from src.services.image_service import ImageService
+from src.services.local_transport import TRANSPORTS, get_local_transport
 from src.utils.validation import validate_image
 
 class ImageController:
@@ -22,12 +23,28 @@ class ImageController:
         
         Args:
             image: Archivo de imagen subido
-            format: Formato de salida (json, numpy)
+            format: Formato de salida (json, numpy, shm, mmap)
             preprocess: Lista de operaciones de preprocesamiento
             
         Returns:
             JSONResponse con la matriz o respuesta binaria según el formato
         """
+        # Validar el formato antes de procesar la imagen
+        format = format.lower()
+        if format not in ("json", "numpy") + TRANSPORTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Formato no soportado: {format}"
+            )
+        transport = None
+        if format in TRANSPORTS:
+            transport = get_local_transport()
+            if transport is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="El transporte local no está habilitado"
+                )
+        
         # Validar imagen
         await validate_image(image)
         
@@ -40,7 +57,7 @@ class ImageController:
             matrix = await ImageService.image_to_matrix(image_bytes, preprocess)
             
             # Devolver en el formato solicitado
-            if format.lower() == "json":
+            if format == "json":
                 return JSONResponse(
                     content={
                         "matrix": matrix.tolist(),
@@ -48,18 +65,41 @@ class ImageController:
                         "dtype": str(matrix.dtype)
                     }
                 )
-            elif format.lower() == "numpy":
+            elif format == "numpy":
                 output = io.BytesIO()
                 np.save(output, matrix)
-                output.seek(0)
-                return output.getvalue()
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Formato no soportado: {format}"
+                return Response(
+                    content=output.getvalue(),
+                    media_type="application/octet-stream"
                 )
+            else:
+                return JSONResponse(content=transport.publish(matrix, format))
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Error al procesar la imagen: {str(e)}"
             )
+
+    @staticmethod
+    async def release_handle(name: str):
+        """
+        Libera una matriz publicada mediante transporte local.
+        
+        Args:
+            name: Nombre del handle devuelto por la conversión
+            
+        Returns:
+            JSONResponse confirmando la liberación
+        """
+        transport = get_local_transport()
+        if transport is None:
+            raise HTTPException(
+                status_code=400,
+                detail="El transporte local no está habilitado"
+            )
+        if not transport.release(name):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Handle no encontrado: {name}"
+            )
+        return JSONResponse(content={"released": name})
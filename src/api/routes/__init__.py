@@ -21,10 +21,24 @@ async def convert_image_to_matrix(
     Convierte una imagen a una matriz numérica.
     
     - **image**: Archivo de imagen a convertir
-    - **format**: Formato de salida (json, numpy)
+    - **format**: Formato de salida (json, numpy, shm, mmap)
     - **preprocess**: Opciones de preprocesamiento (resize, normalize, grayscale)
     """
     try:
         return await ImageController.convert_image(image, format, preprocess)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/handles/{name}", summary="Liberar matriz en transporte local")
+async def release_local_handle(
+    name: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Libera una matriz publicada en memoria compartida o archivo mapeado.
+    
+    - **name**: Nombre del handle devuelto por `/convert`
+    """
+    return await ImageController.release_handle(name)
@@ -1,8 +1,9 @@
 """
 Configuraciones de la aplicación.
 """
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
-from typing import List, Union
+from typing import List, Literal, Optional, Union
 from functools import lru_cache
 import os
 
@@ -18,10 +19,30 @@ class Settings(BaseSettings):
     ALLOWED_EXTENSIONS: Union[str, List[str]] = "jpg,jpeg,png,bmp,tiff"
     MAX_WIDTH: int = 2048
     MAX_HEIGHT: int = 2048
+
+    # Redimensionamiento (compartido por Pillow y OpenCV)
+    RESIZE_FILTER: Literal["area", "bilinear", "bicubic", "lanczos"] = "lanczos"
+    RESIZE_REDUCING_GAP: Optional[float] = None  # Ej. 2.0: reducción previa por bloques (Pillow)
+
+    # Caché de etapas intermedias de preprocesamiento
+    STAGE_CACHE_ENABLED: bool = True
+    STAGE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256MB
+
+    # Entrega local de matrices (memoria compartida / archivos mapeados)
+    LOCAL_TRANSPORT_ENABLED: bool = False
+    LOCAL_TRANSPORT_DIR: str = ""  # Vacío: directorio temporal del sistema
+    LOCAL_TRANSPORT_TTL: int = 60  # Segundos
+
     # Seguridad
     API_KEY_HEADER: str = "X-API-Key"
     DEFAULT_API_KEY: str = "development_key_change_me"
     
+    @field_validator("RESIZE_FILTER", mode="before")
+    @classmethod
+    def _lowercase_resize_filter(cls, value):
+        """Acepta el nombre del filtro sin distinguir mayúsculas."""
+        return value.strip().lower() if isinstance(value, str) else value
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Convertir ALLOWED_EXTENSIONS de string a lista si es necesario
@@ -4,9 +4,14 @@ Servicio para la conversión de imágenes a matrices.
 import numpy as np
 from PIL import Image
 import cv2
+import hashlib
+import time
 from typing import Optional, List, BinaryIO
 from io import BytesIO
 
+from src.services.stage_cache import get_stage_cache
+from src.utils.resize import ResizeEngine
+
 class ImageService:
     @staticmethod
     async def image_to_matrix(
@@ -23,14 +28,45 @@ class ImageService:
         Returns:
             Matriz NumPy con los datos de la imagen
         """
-        # Abrir imagen con Pillow
-        img = Image.open(image_bytes)
+        cache = get_stage_cache()
+        if cache is None:
+            # Abrir imagen con Pillow
+            img = Image.open(image_bytes)
+            
+            # Aplicar preprocesamiento si es necesario
+            if preprocess:
+                img = ImageService._apply_preprocessing(img, preprocess)
+            
+            # Convertir a numpy array
+            return np.array(img)
+        
+        operations = list(preprocess or [])
+        content = image_bytes.read()
+        content_hash = hashlib.sha256(content).hexdigest()
         
-        # Aplicar preprocesamiento si es necesario
-        if preprocess:
-            img = ImageService._apply_preprocessing(img, preprocess)
+        # Reanudar desde la etapa intermedia más avanzada disponible
+        # El coste acumulado parte del de la etapa reutilizada, de modo que
+        # cada entrada guarda el coste de recalcularla desde cero
+        depth, img, cost = cache.longest_prefix(content_hash, operations)
+        if img is None:
+            start = time.perf_counter()
+            img = Image.open(BytesIO(content))
+            img.load()
+            cost = time.perf_counter() - start
+            cache.put(content_hash, (), img, cost)
+            depth = 0
         
-        # Convertir a numpy array
+        for i in range(depth, len(operations)):
+            start = time.perf_counter()
+            result = ImageService._apply_operation(img, operations[i])
+            cost += time.perf_counter() - start
+            # Las operaciones desconocidas devuelven la misma imagen: no se
+            # almacena otra copia de la etapa anterior bajo un nuevo prefijo
+            if result is not img:
+                cache.put(content_hash, operations[:i + 1], result, cost)
+            img = result
+        
+        # Convertir a numpy array (copia, la imagen cacheada no se modifica)
         matrix = np.array(img)
         return matrix
     
@@ -47,22 +83,39 @@ class ImageService:
             Imagen procesada
         """
         for op in operations:
-            if op == "grayscale":
-                img = img.convert('L')
-            elif op.startswith("resize_"):
-                try:
-                    # Formato esperado: resize_widthxheight
-                    dimensions = op.split('_')[1].split('x')
-                    width, height = int(dimensions[0]), int(dimensions[1])
-                    img = img.resize((width, height), Image.LANCZOS)
-                except (IndexError, ValueError):
-                    pass
-            elif op == "normalize":
-                # Convertir a numpy, normalizar y volver a Image
-                img_array = np.array(img, dtype=np.float32)
-                if img_array.max() > 0:
-                    img_array = img_array / 255.0
-                img = Image.fromarray((img_array * 255).astype(np.uint8))
+            img = ImageService._apply_operation(img, op)
+        
+        return img
+    
+    @staticmethod
+    def _apply_operation(img: Image.Image, op: str) -> Image.Image:
+        """
+        Aplica una única operación de preprocesamiento a una imagen.
+        
+        Args:
+            img: Imagen Pillow
+            op: Operación a aplicar
+            
+        Returns:
+            Imagen procesada (las operaciones desconocidas o mal formadas
+            devuelven la imagen sin cambios)
+        """
+        if op == "grayscale":
+            img = img.convert('L')
+        elif op.startswith("resize_"):
+            try:
+                # Formato esperado: resize_widthxheight
+                dimensions = op.split('_')[1].split('x')
+                width, height = int(dimensions[0]), int(dimensions[1])
+            except (IndexError, ValueError):
+                return img
+            img = ResizeEngine.resize_image(img, (width, height))
+        elif op == "normalize":
+            # Convertir a numpy, normalizar y volver a Image
+            img_array = np.array(img, dtype=np.float32)
+            if img_array.max() > 0:
+                img_array = img_array / 255.0
+            img = Image.fromarray((img_array * 255).astype(np.uint8))
         
         return img
     
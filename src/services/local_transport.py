@@ -0,0 +1,246 @@
+"""
+Servicio de entrega local de matrices mediante memoria compartida o
+archivos mapeados en memoria.
+"""
+import atexit
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.config.settings import get_settings
+
+TRANSPORTS = ("shm", "mmap")
+
+# Formato de los nombres generados por `publish`
+_HANDLE_NAME = re.compile(r"itm_[0-9a-f]{16}")
+
+
+@dataclass
+class _Handle:
+    transport: str
+    name: str
+    expires_at: float
+    segment: Optional[shared_memory.SharedMemory] = None
+    path: Optional[str] = None
+
+
+class LocalTransportService:
+    """
+    Publica matrices para clientes en el mismo host y gestiona su ciclo de vida.
+
+    Con el transporte "shm" la matriz se copia a un segmento de
+    `multiprocessing.shared_memory`; con "mmap" se escribe como archivo .npy
+    en el directorio configurado. En ambos casos solo se devuelve un handle
+    con la forma y el tipo de datos, y el recurso se libera al expirar su TTL
+    o cuando el cliente lo solicita. Un hilo en segundo plano, iniciado con
+    `start_sweeper`, revisa periódicamente los TTL aunque no lleguen más
+    peticiones.
+    
+    El registro de handles es propio de cada proceso. Con varios workers
+    (`uvicorn --workers N`), `release` resuelve los handles de otros procesos
+    a partir del nombre: el segmento se abre por nombre y el archivo .npy se
+    busca en el directorio compartido. El TTL lo sigue aplicando el proceso
+    que publicó la matriz.
+    """
+    def __init__(self, directory: str, ttl: int):
+        self.directory = directory
+        self.ttl = ttl
+        self._handles: Dict[str, _Handle] = {}
+        self._lock = threading.Lock()
+        self._stop_sweeper = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def start_sweeper(self, interval: float) -> None:
+        """
+        Inicia un hilo daemon que libera los recursos expirados.
+
+        Args:
+            interval: Segundos entre revisiones
+        """
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweep, args=(interval,), name="local-transport-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Detiene el hilo de limpieza periódica."""
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+    def _sweep(self, interval: float) -> None:
+        while not self._stop_sweeper.wait(interval):
+            self.cleanup_expired()
+
+    def publish(self, matrix: np.ndarray, transport: str = "shm") -> Dict[str, Any]:
+        """
+        Publica una matriz mediante el transporte local indicado.
+
+        Args:
+            matrix: Matriz a publicar
+            transport: Tipo de transporte (shm, mmap)
+
+        Returns:
+            Diccionario con el handle: transporte, nombre o ruta, forma,
+            tipo de datos y momento de expiración (epoch en segundos)
+
+        Raises:
+            ValueError: Si el transporte no está soportado
+        """
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Transporte local no soportado: {transport}")
+
+        self.cleanup_expired()
+        matrix = np.ascontiguousarray(matrix)
+        name = f"itm_{uuid.uuid4().hex[:16]}"
+        handle = _Handle(transport=transport, name=name, expires_at=time.time() + self.ttl)
+
+        if transport == "shm":
+            # SharedMemory no admite segmentos de tamaño 0
+            segment = shared_memory.SharedMemory(name=name, create=True, size=max(matrix.nbytes, 1))
+            np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=segment.buf)[...] = matrix
+            handle.segment = segment
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{name}.npy")
+            target = np.lib.format.open_memmap(path, mode="w+", dtype=matrix.dtype, shape=matrix.shape)
+            target[...] = matrix
+            target.flush()
+            del target
+            handle.path = path
+
+        with self._lock:
+            self._handles[name] = handle
+
+        result = {
+            "transport": transport,
+            "name": name,
+            "shape": matrix.shape,
+            "dtype": str(matrix.dtype),
+            "expires_at": handle.expires_at,
+        }
+        if handle.path is not None:
+            result["path"] = handle.path
+        return result
+
+    def release(self, name: str) -> bool:
+        """
+        Libera un recurso publicado.
+
+        Args:
+            name: Nombre del handle
+
+        Returns:
+            True si el handle existía y se liberó
+        """
+        with self._lock:
+            handle = self._handles.pop(name, None)
+        if handle is None:
+            # Puede haberlo publicado otro worker
+            return self._release_by_name(name)
+        self._dispose(handle)
+        return True
+    
+    def _release_by_name(self, name: str) -> bool:
+        """
+        Libera un recurso publicado por otro proceso a partir de su nombre.
+        
+        Args:
+            name: Nombre del handle
+            
+        Returns:
+            True si existía un segmento o archivo con ese nombre
+        """
+        # Solo se aceptan nombres generados por `publish`
+        if not _HANDLE_NAME.fullmatch(name):
+            return False
+        
+        released = False
+        try:
+            segment = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            pass
+        else:
+            segment.close()
+            try:
+                segment.unlink()
+                released = True
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(os.path.join(self.directory, f"{name}.npy"))
+            released = True
+        except FileNotFoundError:
+            pass
+        return released
+
+    def cleanup_expired(self) -> int:
+        """
+        Libera los recursos cuyo TTL ha expirado.
+
+        Returns:
+            Número de recursos liberados
+        """
+        now = time.time()
+        with self._lock:
+            expired = [name for name, handle in self._handles.items() if handle.expires_at <= now]
+            handles = [self._handles.pop(name) for name in expired]
+        for handle in handles:
+            self._dispose(handle)
+        return len(handles)
+
+    def release_all(self) -> None:
+        """Detiene la limpieza periódica y libera todos los recursos publicados."""
+        self.stop_sweeper()
+        with self._lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+        for handle in handles:
+            self._dispose(handle)
+
+    @staticmethod
+    def _dispose(handle: _Handle) -> None:
+        """Cierra y elimina el recurso asociado a un handle."""
+        if handle.segment is not None:
+            handle.segment.close()
+            try:
+                handle.segment.unlink()
+            except FileNotFoundError:
+                pass
+        if handle.path is not None:
+            try:
+                os.remove(handle.path)
+            except FileNotFoundError:
+                pass
+
+
+@lru_cache()
+def get_local_transport() -> Optional[LocalTransportService]:
+    """
+    Obtiene el servicio de transporte local compartido.
+
+    Returns:
+        Instancia de LocalTransportService, o None si está deshabilitado
+    """
+    settings = get_settings()
+    if not settings.LOCAL_TRANSPORT_ENABLED:
+        return None
+    directory = settings.LOCAL_TRANSPORT_DIR or os.path.join(tempfile.gettempdir(), "imagetomatrix")
+    service = LocalTransportService(directory, settings.LOCAL_TRANSPORT_TTL)
+    # Revisar con la mitad del TTL acota el tiempo extra de vida a TTL / 2
+    service.start_sweeper(max(settings.LOCAL_TRANSPORT_TTL / 2, 1.0))
+    atexit.register(service.release_all)
+    return service
@@ -0,0 +1,198 @@
+"""
+Caché de etapas intermedias del pipeline de preprocesamiento.
+"""
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from src.config.settings import get_settings
+
+# Bytes por banda según el modo de Pillow (por defecto 1 byte)
+_BYTES_PER_BAND = {"I": 4, "F": 4, "I;16": 2, "I;16B": 2, "I;16L": 2}
+
+StageKey = Tuple[str, Tuple[str, ...]]
+
+
+@dataclass
+class _StageEntry:
+    image: Image.Image
+    size: int
+    cost: float
+    # Número de inserción; identifica la entrada vigente en el heap
+    seq: int
+
+
+class StageCache:
+    """
+    Caché de imágenes intermedias indexadas por hash del contenido y
+    prefijo del pipeline de preprocesamiento.
+
+    El prefijo vacío corresponde a la imagen decodificada. Cuando se supera
+    el presupuesto de memoria se expulsan primero las entradas con menor
+    coste de recálculo por byte (en caso de empate, las insertadas antes).
+    Las prioridades se mantienen en un heap con borrado perezoso: al
+    reemplazar una entrada su elemento anterior queda obsoleto y se descarta
+    al llegar a la cima.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: Dict[StageKey, _StageEntry] = {}
+        self._heap: List[Tuple[float, int, StageKey]] = []
+        self._counter = itertools.count()
+        self._current_bytes = 0
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_size(img: Image.Image) -> int:
+        """
+        Estima el tamaño en bytes de los píxeles de una imagen.
+
+        Args:
+            img: Imagen Pillow
+
+        Returns:
+            Tamaño aproximado en bytes
+        """
+        return img.width * img.height * len(img.getbands()) * _BYTES_PER_BAND.get(img.mode, 1)
+
+    @staticmethod
+    def stage_name(prefix: Sequence[str]) -> str:
+        """Nombre de la etapa final de un prefijo ("decode" si está vacío)."""
+        return prefix[-1] if prefix else "decode"
+
+    def longest_prefix(
+        self,
+        content_hash: str,
+        operations: Sequence[str]
+    ) -> Tuple[int, Optional[Image.Image], float]:
+        """
+        Busca la etapa almacenada más avanzada para un plan de preprocesamiento.
+
+        Args:
+            content_hash: Hash del contenido de la imagen original
+            operations: Plan completo de operaciones
+
+        Returns:
+            Tupla (número de operaciones ya aplicadas, imagen, coste de
+            recálculo de la etapa). Si no hay ninguna etapa almacenada
+            devuelve (-1, None, 0.0).
+        """
+        with self._lock:
+            for depth in range(len(operations), -1, -1):
+                prefix = tuple(operations[:depth])
+                key = (content_hash, prefix)
+                entry = self._entries.get(key)
+                name = self.stage_name(prefix)
+                if entry is not None:
+                    self._hits[name] = self._hits.get(name, 0) + 1
+                    return depth, entry.image, entry.cost
+                self._misses[name] = self._misses.get(name, 0) + 1
+        return -1, None, 0.0
+
+    def put(
+        self,
+        content_hash: str,
+        prefix: Sequence[str],
+        img: Image.Image,
+        cost: float
+    ) -> None:
+        """
+        Almacena una etapa intermedia.
+
+        Args:
+            content_hash: Hash del contenido de la imagen original
+            prefix: Operaciones aplicadas para obtener la imagen
+            img: Imagen resultante (no debe modificarse después)
+            cost: Tiempo en segundos necesario para recalcular la etapa desde
+                la decodificación (coste de la etapa padre más el de esta)
+        """
+        size = self.image_size(img)
+        if size > self.max_bytes:
+            return
+
+        key = (content_hash, tuple(prefix))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= previous.size
+            seq = next(self._counter)
+            self._entries[key] = _StageEntry(image=img, size=size, cost=cost, seq=seq)
+            self._current_bytes += size
+            heapq.heappush(self._heap, (cost / max(size, 1), seq, key))
+            self._evict()
+            self._compact()
+
+    def _evict(self) -> None:
+        """Expulsa entradas de menor coste por byte hasta respetar el presupuesto."""
+        while self._current_bytes > self.max_bytes and self._heap:
+            _, seq, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is None or entry.seq != seq:
+                # Elemento obsoleto de una entrada reemplazada o ya expulsada
+                continue
+            del self._entries[key]
+            self._current_bytes -= entry.size
+
+    def _compact(self) -> None:
+        """Reconstruye el heap cuando los elementos obsoletos dominan."""
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                (entry.cost / max(entry.size, 1), entry.seq, key)
+                for key, entry in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia las estadísticas."""
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+            self._current_bytes = 0
+            self._hits.clear()
+            self._misses.clear()
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Devuelve estadísticas de uso de la caché.
+
+        Returns:
+            Diccionario con memoria ocupada, número de entradas y aciertos,
+            fallos y tasa de acierto por etapa
+        """
+        with self._lock:
+            stages = {}
+            for name in sorted(set(self._hits) | set(self._misses)):
+                hits = self._hits.get(name, 0)
+                misses = self._misses.get(name, 0)
+                stages[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+            return {
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "stages": stages,
+            }
+
+
+@lru_cache()
+def get_stage_cache() -> Optional[StageCache]:
+    """
+    Obtiene la caché de etapas compartida por el servicio.
+
+    Returns:
+        Instancia de StageCache, o None si está deshabilitada
+    """
+    settings = get_settings()
+    if not settings.STAGE_CACHE_ENABLED or settings.STAGE_CACHE_MAX_BYTES <= 0:
+        return None
+    return StageCache(settings.STAGE_CACHE_MAX_BYTES)
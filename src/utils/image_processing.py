@@ -3,22 +3,92 @@ Utilidades para el procesamiento avanzado de imágenes.
 """
 import numpy as np
 import cv2
-from typing import Tuple, Optional, Dict, Any
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Tuple, Optional, Dict, Any, Iterable, Union, Callable, List
+
+from src.utils.resize import ResizeEngine
+
+# Parámetros HOG compartidos por la extracción individual y por lotes
+HOG_BLOCK_SIZE = (16, 16)
+HOG_BLOCK_STRIDE = (8, 8)
+HOG_CELL_SIZE = (8, 8)
+HOG_NBINS = 9
+HOG_DEFAULT_WINDOW = (64, 64)
+
+# ORB descarta los puntos a menos de edgeThreshold (31) píxeles del borde:
+# en ventanas de lado menor no puede encontrar ninguno
+MIN_KEYPOINT_WINDOW = 2 * 31 + 1
+
+# Dimensión de los descriptores por tipo de característica
+DESCRIPTOR_SIZES = {"sift": 128, "orb": 32}
+
+# Detectores reutilizados por hilo (los objetos de OpenCV no son thread-safe)
+_detectors = threading.local()
+
+# Tamaño del pool compartido (el valor por defecto de ThreadPoolExecutor)
+EXECUTOR_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Pool de hilos único y acotado compartido por todas las llamadas.
+
+    Al reutilizar los hilos, los detectores guardados en `_detectors`
+    sobreviven de una llamada a otra.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="features"
+            )
+        return _executor
+
+
+def _bounded_map(
+    executor: ThreadPoolExecutor,
+    fn: Callable[[np.ndarray], np.ndarray],
+    items: List[np.ndarray],
+    limit: int
+) -> List[np.ndarray]:
+    """Como `executor.map`, pero con a lo sumo `limit` tareas en curso."""
+    results = []
+    pending = deque()
+    for item in items:
+        if len(pending) >= limit:
+            results.append(pending.popleft().result())
+        pending.append(executor.submit(fn, item))
+    while pending:
+        results.append(pending.popleft().result())
+    return results
 
 class ImageProcessingUtils:
     @staticmethod
-    def resize_image(image: np.ndarray, target_size: Tuple[int, int]) -> np.ndarray:
+    def resize_image(
+        image: np.ndarray,
+        target_size: Tuple[int, int],
+        filter_name: Optional[str] = None
+    ) -> np.ndarray:
         """
         Redimensiona una imagen al tamaño especificado.
         
         Args:
             image: Matriz de la imagen
             target_size: (ancho, alto) objetivo
+            filter_name: Filtro (area, bilinear, bicubic, lanczos). Por
+                defecto RESIZE_FILTER, el mismo que usa el preprocesamiento
             
         Returns:
             Imagen redimensionada como matriz numpy
         """
-        return cv2.resize(image, target_size, interpolation=cv2.INTER_AREA)
+        return ResizeEngine.resize_array(image, target_size, filter_name)
     
     @staticmethod
     def normalize_image(image: np.ndarray) -> np.ndarray:
@@ -66,10 +136,10 @@ class ImageProcessingUtils:
             # Histograma de Gradientes Orientados
             # Parámetros para HOG
             win_size = (64, 64)
-            block_size = (16, 16)
-            block_stride = (8, 8)
-            cell_size = (8, 8)
-            nbins = 9
+            block_size = HOG_BLOCK_SIZE
+            block_stride = HOG_BLOCK_STRIDE
+            cell_size = HOG_CELL_SIZE
+            nbins = HOG_NBINS
             
             # Redimensionar para HOG si es necesario
             if gray.shape[0] < 64 or gray.shape[1] < 64:
@@ -100,3 +170,226 @@ class ImageProcessingUtils:
                 result["keypoint_locations"] = [(kp.pt[0], kp.pt[1]) for kp in keypoints[:10]]
                 
         return result
+
+    @staticmethod
+    def _get_detector(feature_type: str, window: Optional[Tuple[int, int]]):
+        """
+        Obtiene un detector de OpenCV reutilizable para el hilo actual.
+        
+        Args:
+            feature_type: Tipo de características (hog, sift, orb)
+            window: Tamaño de ventana (ancho, alto), necesario para HOG
+            
+        Returns:
+            Detector de OpenCV
+        """
+        cache = getattr(_detectors, "cache", None)
+        if cache is None:
+            cache = _detectors.cache = {}
+        
+        key = (feature_type, window)
+        detector = cache.get(key)
+        if detector is None:
+            if feature_type == "hog":
+                detector = cv2.HOGDescriptor(
+                    window, HOG_BLOCK_SIZE, HOG_BLOCK_STRIDE, HOG_CELL_SIZE, HOG_NBINS
+                )
+            elif feature_type == "sift":
+                detector = cv2.SIFT_create()
+            elif feature_type == "orb":
+                detector = cv2.ORB_create()
+            else:
+                raise ValueError(f"Tipo de características no soportado: {feature_type}")
+            cache[key] = detector
+        return detector
+    
+    @staticmethod
+    def _to_gray_window(
+        image: np.ndarray,
+        window: Optional[Tuple[int, int]]
+    ) -> np.ndarray:
+        """
+        Convierte una imagen a escala de grises uint8 con tamaño de ventana fijo.
+        
+        Args:
+            image: Matriz de la imagen
+            window: Tamaño (ancho, alto) de salida, o None para no redimensionar
+            
+        Returns:
+            Imagen en escala de grises como matriz uint8
+        """
+        if len(image.shape) > 2 and image.shape[2] > 1:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        elif len(image.shape) > 2:
+            gray = image[:, :, 0]
+        else:
+            gray = image
+        
+        if gray.dtype != np.uint8:
+            # Las imágenes normalizadas en [0, 1] se reescalan a [0, 255]
+            if np.issubdtype(gray.dtype, np.floating) and gray.size and gray.max() <= 1.0:
+                gray = gray * 255.0
+            gray = np.clip(gray, 0, 255).astype(np.uint8)
+        
+        if window is not None and (gray.shape[1], gray.shape[0]) != tuple(window):
+            # "area" solo promedia al reducir; al ampliar se interpola
+            shrinking = gray.shape[1] >= window[0] and gray.shape[0] >= window[1]
+            gray = ResizeEngine.resize_array(gray, window, "area" if shrinking else "bilinear")
+        return gray
+    
+    @staticmethod
+    def _compute_descriptors(
+        image: np.ndarray,
+        feature_type: str,
+        window: Optional[Tuple[int, int]]
+    ) -> np.ndarray:
+        """
+        Calcula los descriptores de una imagen como matriz (K, D) float32.
+        
+        Args:
+            image: Matriz de la imagen
+            feature_type: Tipo de características (hog, sift, orb)
+            window: Tamaño (ancho, alto) de normalización
+            
+        Returns:
+            Descriptores de la imagen (una fila para HOG)
+        """
+        gray = ImageProcessingUtils._to_gray_window(image, window)
+        detector = ImageProcessingUtils._get_detector(feature_type, window)
+        
+        if feature_type == "hog":
+            return detector.compute(gray).reshape(1, -1)
+        
+        _, descriptors = detector.detectAndCompute(gray, None)
+        if descriptors is None:
+            return np.empty((0, DESCRIPTOR_SIZES[feature_type]), dtype=np.float32)
+        return descriptors.astype(np.float32, copy=False)
+    
+    @staticmethod
+    def _validate_window(feature_type: str, window: Tuple[int, int]) -> None:
+        """
+        Comprueba que la ventana es válida para el tipo de características.
+        
+        Args:
+            feature_type: Tipo de características (hog, sift, orb)
+            window: Tamaño (ancho, alto) de normalización
+            
+        Raises:
+            ValueError: Si la ventana no es compatible con el detector
+        """
+        width, height = window
+        if feature_type == "hog":
+            # La ventana debe contener un número entero de desplazamientos de bloque
+            block, stride = HOG_BLOCK_SIZE, HOG_BLOCK_STRIDE
+            if (
+                width < block[0] or height < block[1]
+                or (width - block[0]) % stride[0] or (height - block[1]) % stride[1]
+            ):
+                raise ValueError(
+                    f"Ventana HOG inválida {window}: cada lado debe ser "
+                    f"{block[0]} + {stride[0]}k (por ejemplo 64 o 128)"
+                )
+        elif min(width, height) < MIN_KEYPOINT_WINDOW:
+            raise ValueError(
+                f"Ventana {window} demasiado pequeña para {feature_type}: "
+                f"cada lado debe ser al menos {MIN_KEYPOINT_WINDOW}"
+            )
+    
+    @staticmethod
+    def extract_batch_features(
+        images: Union[np.ndarray, Iterable[np.ndarray]],
+        feature_type: str = "hog",
+        window: Optional[Tuple[int, int]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 256,
+        out: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Extrae descriptores de N imágenes a la vez.
+        
+        Cada imagen se convierte a escala de grises y se redimensiona a la
+        ventana indicada, de modo que los descriptores HOG tienen siempre la
+        misma longitud. Los cálculos se reparten en un pool de hilos que se
+        comparte entre llamadas, y cada hilo reutiliza sus detectores.
+        
+        Para HOG, si se conoce el número de imágenes (matriz apilada o
+        secuencia con `len`) o se pasa `out`, los descriptores se escriben
+        por bloques directamente en la matriz de salida. Con un iterador de
+        longitud desconocida y sin `out` se concatenan los bloques al final,
+        lo que duplica temporalmente la memoria.
+        
+        Args:
+            images: Matriz apilada (N, H, W[, C]) o iterable de imágenes
+            feature_type: Tipo de características a extraer (hog, sift, orb)
+            window: Tamaño (ancho, alto) de normalización. Para HOG, por
+                defecto (64, 64); cada lado debe ser 16 + 8k. Para SIFT y ORB,
+                por defecto None (se conserva el tamaño original); si se indica,
+                cada lado debe ser al menos MIN_KEYPOINT_WINDOW
+            max_workers: Número máximo de tareas simultáneas de esta llamada
+                dentro del pool compartido (por defecto, todo el pool)
+            chunk_size: Número de imágenes procesadas por bloque
+            out: Matriz (N, D) float32 de destino para HOG, por ejemplo un
+                `np.memmap`. Debe tener al menos tantas filas como imágenes
+            
+        Returns:
+            Tupla (descriptores, offsets). Los descriptores son una matriz
+            contigua (N, D) float32 para HOG o (K, D) para SIFT/ORB. Para
+            SIFT/ORB, offsets es un vector int64 de tamaño N + 1 tal que los
+            descriptores de la imagen i son descriptors[offsets[i]:offsets[i + 1]];
+            para HOG es None. Si se pasa `out`, se devuelven sus primeras N filas.
+        """
+        if feature_type not in ("hog", "sift", "orb"):
+            raise ValueError(f"Tipo de características no soportado: {feature_type}")
+        if out is not None and feature_type != "hog":
+            raise ValueError("El parámetro out solo está disponible para HOG")
+        if window is None and feature_type == "hog":
+            window = HOG_DEFAULT_WINDOW
+        if window is not None:
+            window = (int(window[0]), int(window[1]))
+            ImageProcessingUtils._validate_window(feature_type, window)
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers debe ser mayor que 0")
+        limit = min(max_workers or EXECUTOR_MAX_WORKERS, EXECUTOR_MAX_WORKERS)
+        
+        def compute(image: np.ndarray) -> np.ndarray:
+            return ImageProcessingUtils._compute_descriptors(image, feature_type, window)
+        
+        executor = _get_executor()
+        iterator = iter(images)
+        
+        def chunks():
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    return
+                yield _bounded_map(executor, compute, chunk, limit)
+        
+        if feature_type == "hog":
+            size = ImageProcessingUtils._get_detector("hog", window).getDescriptorSize()
+            if out is None and hasattr(images, "__len__"):
+                out = np.empty((len(images), size), dtype=np.float32)
+            
+            if out is None:
+                blocks = [np.concatenate(chunk) for chunk in chunks()]
+                if not blocks:
+                    return np.empty((0, size), dtype=np.float32), None
+                return np.ascontiguousarray(np.concatenate(blocks), dtype=np.float32), None
+            
+            if out.ndim != 2 or out.shape[1] != size:
+                raise ValueError(f"out debe tener forma (N, {size})")
+            written = 0
+            for chunk in chunks():
+                if written + len(chunk) > out.shape[0]:
+                    raise ValueError("out no tiene filas suficientes para todas las imágenes")
+                out[written:written + len(chunk)] = np.concatenate(chunk)
+                written += len(chunk)
+            return out[:written], None
+        
+        blocks = [block for chunk in chunks() for block in chunk]
+        offsets = np.zeros(len(blocks) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(block) for block in blocks])
+        if not blocks:
+            descriptors = np.empty((0, DESCRIPTOR_SIZES[feature_type]), dtype=np.float32)
+        else:
+            descriptors = np.ascontiguousarray(np.concatenate(blocks), dtype=np.float32)
+        return descriptors, offsets
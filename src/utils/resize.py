@@ -0,0 +1,201 @@
+"""
+Motor de redimensionamiento compartido por imágenes Pillow y matrices NumPy.
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.config.settings import get_settings
+
+# Filtro -> constante de Pillow
+FILTERS = {
+    "area": Image.BOX,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+}
+
+# Filtro -> interpolación de OpenCV (camino de matrices)
+CV2_INTERPOLATIONS = {
+    "area": cv2.INTER_AREA,
+    "bilinear": cv2.INTER_LINEAR,
+    "bicubic": cv2.INTER_CUBIC,
+    "lanczos": cv2.INTER_LANCZOS4,
+}
+
+# Modos en los que `Image.reduce` promedia bloques (excluye 1, P, PA e I;16*)
+_REDUCE_MODES = {"L", "LA", "La", "RGB", "RGBA", "RGBa", "RGBX", "CMYK", "YCbCr", "LAB", "HSV", "I", "F"}
+
+# Tipos de datos que cv2.resize admite directamente, y número máximo de
+# canales por llamada con INTER_AREA
+_CV2_DTYPES = {np.dtype(np.uint8), np.dtype(np.uint16), np.dtype(np.int16), np.dtype(np.float32), np.dtype(np.float64)}
+_CV2_MAX_CHANNELS = 4
+
+
+@dataclass(frozen=True)
+class ResizePlan:
+    """Estrategia de redimensionamiento para un par de tamaños y un filtro."""
+    filter_name: str
+    # Factores enteros (x, y) de la reducción previa por promedio de bloques
+    block_factors: Optional[Tuple[int, int]] = None
+    # La reducción por bloques produce exactamente el tamaño de destino
+    exact: bool = False
+    identity: bool = False
+
+
+def resize_plan(
+    src_size: Tuple[int, int],
+    dst_size: Tuple[int, int],
+    filter_name: str
+) -> ResizePlan:
+    """
+    Resuelve la estrategia para redimensionar de src_size a dst_size.
+
+    Cuando algún eje se reduce al menos a la mitad, `block_factors` indica
+    la reducción entera por promedio de bloques que puede aplicarse antes
+    del filtro final; si los tamaños son múltiplos exactos, `exact` indica
+    que no queda nada más que hacer.
+
+    Args:
+        src_size: (ancho, alto) de origen
+        dst_size: (ancho, alto) de destino
+        filter_name: Nombre del filtro (area, bilinear, bicubic, lanczos)
+
+    Returns:
+        Plan de redimensionamiento
+    """
+    if filter_name not in FILTERS:
+        raise ValueError(f"Filtro de redimensionamiento no soportado: {filter_name}")
+    (src_width, src_height), (width, height) = src_size, dst_size
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Tamaño de destino inválido: {dst_size}")
+
+    if (src_width, src_height) == (width, height):
+        return ResizePlan(filter_name, identity=True)
+    factors = (max(src_width // width, 1), max(src_height // height, 1))
+    if factors == (1, 1):
+        return ResizePlan(filter_name)
+    exact = src_width == width * factors[0] and src_height == height * factors[1]
+    return ResizePlan(filter_name, block_factors=factors, exact=exact)
+
+
+class ResizeEngine:
+    @staticmethod
+    def default_filter() -> str:
+        """Filtro configurado para todos los caminos de redimensionamiento."""
+        return get_settings().RESIZE_FILTER
+
+    @staticmethod
+    def resize_image(
+        img: Image.Image,
+        target_size: Tuple[int, int],
+        filter_name: Optional[str] = None
+    ) -> Image.Image:
+        """
+        Redimensiona una imagen Pillow.
+
+        Las reducciones por factores enteros con el filtro "area" equivalen a
+        promediar bloques y se resuelven con `Image.reduce`.
+
+        Args:
+            img: Imagen Pillow
+            target_size: (ancho, alto) objetivo
+            filter_name: Filtro a usar (por defecto el configurado)
+
+        Returns:
+            Imagen redimensionada
+        """
+        plan = resize_plan(img.size, tuple(target_size), filter_name or ResizeEngine.default_filter())
+        if plan.identity:
+            return img.copy()
+        if plan.exact and plan.filter_name == "area" and img.mode in _REDUCE_MODES:
+            return img.reduce(plan.block_factors)
+        return img.resize(
+            tuple(target_size),
+            FILTERS[plan.filter_name],
+            reducing_gap=get_settings().RESIZE_REDUCING_GAP
+        )
+
+    @staticmethod
+    def resize_array(
+        image: np.ndarray,
+        target_size: Tuple[int, int],
+        filter_name: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Redimensiona una matriz (H, W) o (H, W, C) con OpenCV.
+
+        Cada canal se interpola de forma independiente (el canal alfa no
+        premultiplica al resto). Las interpolaciones de OpenCV distintas de
+        INTER_AREA no amplían su núcleo al reducir, así que con "bilinear",
+        "bicubic" y "lanczos" las reducciones de 2x o más se hacen primero
+        por promedio de bloques con factores enteros y el filtro solo cubre
+        el factor restante (menor que 2). Los tipos que OpenCV no admite se
+        procesan en float64 y se convierten de vuelta al tipo original.
+
+        Args:
+            image: Matriz de la imagen
+            target_size: (ancho, alto) objetivo
+            filter_name: Filtro a usar (por defecto el configurado)
+
+        Returns:
+            Imagen redimensionada como matriz numpy del mismo tipo de datos
+        """
+        target_size = (int(target_size[0]), int(target_size[1]))
+        plan = resize_plan(
+            (image.shape[1], image.shape[0]), target_size, filter_name or ResizeEngine.default_filter()
+        )
+        if plan.identity:
+            return image.copy()
+
+        dtype = image.dtype if image.dtype in _CV2_DTYPES else np.float64
+        source = np.ascontiguousarray(image, dtype=dtype)
+        if plan.filter_name == "area":
+            result = ResizeEngine._cv2_resize(source, target_size, cv2.INTER_AREA)
+        else:
+            result = source
+            if plan.block_factors is not None:
+                reduced_size = (
+                    image.shape[1] // plan.block_factors[0],
+                    image.shape[0] // plan.block_factors[1]
+                )
+                result = ResizeEngine._cv2_resize(result, reduced_size, cv2.INTER_AREA)
+            if not plan.exact:
+                result = ResizeEngine._cv2_resize(
+                    result, target_size, CV2_INTERPOLATIONS[plan.filter_name]
+                )
+
+        if image.ndim == 3 and result.ndim == 2:
+            # OpenCV descarta el eje de canal en las matrices (H, W, 1)
+            result = result[:, :, np.newaxis]
+        return result if result.dtype == image.dtype else ResizeEngine._cast(result, image.dtype)
+
+    @staticmethod
+    def _cv2_resize(image: np.ndarray, target_size: Tuple[int, int], interpolation: int) -> np.ndarray:
+        """Aplica cv2.resize en grupos de hasta 4 canales."""
+        if image.ndim == 2 or image.shape[2] <= _CV2_MAX_CHANNELS:
+            return cv2.resize(image, target_size, interpolation=interpolation)
+        groups = [
+            cv2.resize(
+                np.ascontiguousarray(image[:, :, c:c + _CV2_MAX_CHANNELS]),
+                target_size,
+                interpolation=interpolation
+            )
+            for c in range(0, image.shape[2], _CV2_MAX_CHANNELS)
+        ]
+        return np.concatenate(
+            [group[:, :, np.newaxis] if group.ndim == 2 else group for group in groups], axis=2
+        )
+
+    @staticmethod
+    def _cast(result: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        """Convierte el resultado en coma flotante al tipo de datos original."""
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            result = np.clip(np.rint(result), info.min, info.max)
+        elif dtype == np.bool_:
+            result = result >= 0.5
+        return result.astype(dtype)
@@ -4,11 +4,15 @@ Pruebas de integración para los endpoints de la API.
 import pytest
 from fastapi.testclient import TestClient
 import io
+import os
+from multiprocessing import shared_memory
 from PIL import Image
 import numpy as np
 
 from src.api.app import app
 from src.config.settings import get_settings
+from src.services.image_service import ImageService
+from src.services.local_transport import LocalTransportService
 
 settings = get_settings()
 client = TestClient(app)
@@ -78,3 +82,101 @@ def test_convert_endpoint_unauthorized(test_image):
     )
     
     assert response.status_code == 401
+
+def test_convert_endpoint_numpy_format(test_image):
+    """Prueba el endpoint con salida en formato NumPy."""
+    files = {
+        'image': ('test.png', test_image, 'image/png')
+    }
+    data = {
+        'format': 'numpy'
+    }
+    headers = {
+        settings.API_KEY_HEADER: settings.DEFAULT_API_KEY
+    }
+    
+    response = client.post(
+        "/api/v1/convert",
+        files=files,
+        data=data,
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    matrix = np.load(io.BytesIO(response.content))
+    assert matrix.shape == (100, 100, 3)
+
+@pytest.fixture
+def local_transport(monkeypatch, tmp_path):
+    """Habilita el transporte local sobre un directorio temporal."""
+    service = LocalTransportService(str(tmp_path), ttl=60)
+    monkeypatch.setattr("src.api.controllers.image_controller.get_local_transport", lambda: service)
+    yield service
+    service.release_all()
+
+def _convert(test_image, format):
+    """Envía una conversión autenticada con el formato indicado."""
+    return client.post(
+        "/api/v1/convert",
+        files={'image': ('test.png', test_image, 'image/png')},
+        data={'format': format},
+        headers={settings.API_KEY_HEADER: settings.DEFAULT_API_KEY}
+    )
+
+def _release(name):
+    """Libera un handle de transporte local."""
+    return client.delete(
+        f"/api/v1/handles/{name}",
+        headers={settings.API_KEY_HEADER: settings.DEFAULT_API_KEY}
+    )
+
+def test_convert_endpoint_shm_format(test_image, local_transport):
+    """Prueba la conversión a memoria compartida y su liberación."""
+    response = _convert(test_image, 'shm')
+
+    assert response.status_code == 200
+    handle = response.json()
+    segment = shared_memory.SharedMemory(name=handle["name"])
+    try:
+        view = np.ndarray(handle["shape"], dtype=handle["dtype"], buffer=segment.buf)
+        assert view.shape == (100, 100, 3)
+        assert np.all(view[:, :, 2] == 255)
+        del view
+    finally:
+        segment.close()
+
+    assert _release(handle["name"]).status_code == 200
+    assert _release(handle["name"]).status_code == 404
+
+def test_convert_endpoint_mmap_format(test_image, local_transport):
+    """Prueba la conversión a archivo mapeado y su liberación."""
+    response = _convert(test_image, 'mmap')
+
+    assert response.status_code == 200
+    handle = response.json()
+    assert np.load(handle["path"], mmap_mode="r").shape == (100, 100, 3)
+
+    response = _release(handle["name"])
+    assert response.status_code == 200
+    assert response.json() == {"released": handle["name"]}
+    assert not os.path.exists(handle["path"])
+
+def test_convert_endpoint_local_transport_disabled(test_image, monkeypatch):
+    """Con el transporte deshabilitado se responde 400 sin procesar la imagen."""
+    async def fail(*args, **kwargs):
+        raise AssertionError("La imagen no debería procesarse")
+
+    monkeypatch.setattr("src.api.controllers.image_controller.get_local_transport", lambda: None)
+    monkeypatch.setattr(ImageService, "image_to_matrix", fail)
+    response = _convert(test_image, 'shm')
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "El transporte local no está habilitado"
+    assert _release("itm_0000000000000000").status_code == 400
+
+def test_convert_endpoint_unsupported_format(test_image):
+    """Un formato desconocido se rechaza con 400."""
+    response = _convert(test_image, 'xml')
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Formato no soportado: xml"
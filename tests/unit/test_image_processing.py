@@ -0,0 +1,105 @@
+"""
+Pruebas unitarias para las utilidades de procesamiento de imágenes.
+"""
+import pytest
+import numpy as np
+
+from src.utils.image_processing import ImageProcessingUtils
+
+@pytest.fixture
+def sample_images():
+    """Crea imágenes aleatorias de distintos tamaños."""
+    rng = np.random.default_rng(0)
+    return [
+        rng.integers(0, 256, size=(32, 40, 3), dtype=np.uint8),
+        rng.integers(0, 256, size=(128, 96, 3), dtype=np.uint8),
+        rng.integers(0, 256, size=(64, 64), dtype=np.uint8),
+    ]
+
+def test_batch_hog_fixed_length(sample_images):
+    """Los descriptores HOG por lotes tienen longitud fija y son contiguos."""
+    descriptors, offsets = ImageProcessingUtils.extract_batch_features(sample_images, "hog")
+
+    assert offsets is None
+    assert descriptors.shape == (3, 1764)
+    assert descriptors.dtype == np.float32
+    assert descriptors.flags["C_CONTIGUOUS"]
+
+    # Coincide con la extracción individual para imágenes de 64x64
+    single = ImageProcessingUtils.extract_image_features(sample_images[2], "hog")
+    assert np.allclose(descriptors[2], single["hog_features"].ravel())
+
+def test_batch_window_upscale_interpolates():
+    """Las imágenes menores que la ventana se amplían interpolando."""
+    gradient = np.tile(np.arange(0, 256, 8, dtype=np.uint8), (32, 1))
+    gray = ImageProcessingUtils._to_gray_window(gradient, (64, 64))
+
+    # Una ampliación por vecino más cercano solo repetiría los 32 valores
+    assert len(np.unique(gray[0])) > 32
+
+def test_batch_hog_from_stacked_array(sample_images):
+    """Acepta una matriz apilada (N, H, W) y un generador."""
+    stacked = np.stack([sample_images[2]] * 4)
+    from_array, _ = ImageProcessingUtils.extract_batch_features(stacked, "hog", chunk_size=3)
+    from_iter, _ = ImageProcessingUtils.extract_batch_features(iter(stacked), "hog")
+
+    assert from_array.shape == (4, 1764)
+    assert np.array_equal(from_array, from_iter)
+
+def test_batch_hog_into_memmap(sample_images, tmp_path):
+    """Los descriptores HOG se escriben directamente en un memmap."""
+    out = np.lib.format.open_memmap(
+        str(tmp_path / "hog.npy"), mode="w+", dtype=np.float32, shape=(3, 1764)
+    )
+    descriptors, _ = ImageProcessingUtils.extract_batch_features(iter(sample_images), "hog", out=out, chunk_size=2)
+    expected, _ = ImageProcessingUtils.extract_batch_features(sample_images, "hog")
+
+    assert np.shares_memory(descriptors, out)
+    assert np.array_equal(np.load(tmp_path / "hog.npy"), expected)
+
+def test_batch_orb_offsets(sample_images):
+    """Para ORB se devuelve un índice de offsets por imagen."""
+    descriptors, offsets = ImageProcessingUtils.extract_batch_features(
+        sample_images, "orb", window=(256, 256)
+    )
+
+    assert offsets.shape == (4,)
+    assert offsets[0] == 0
+    assert offsets[-1] == descriptors.shape[0]
+    assert descriptors.shape[1] == 32
+    assert descriptors.dtype == np.float32
+
+def test_batch_unsupported_feature(sample_images):
+    """Un tipo de características desconocido produce un error."""
+    with pytest.raises(ValueError):
+        ImageProcessingUtils.extract_batch_features(sample_images, "surf")
+
+def test_batch_orb_keeps_original_size_by_default():
+    """Sin ventana explícita, ORB no reduce las imágenes y encuentra puntos."""
+    board = (np.indices((512, 512)).sum(axis=0) // 32 % 2 * 255).astype(np.uint8)
+    _, offsets = ImageProcessingUtils.extract_batch_features([board], "orb")
+
+    assert offsets[-1] > 0
+
+@pytest.mark.parametrize("feature_type,window", [
+    ("hog", (50, 50)),
+    ("hog", (64, 60)),
+    ("hog", (8, 8)),
+    ("orb", (32, 32)),
+    ("sift", (256, 48)),
+])
+def test_batch_invalid_window(sample_images, feature_type, window):
+    """Las ventanas incompatibles con el detector se rechazan antes de procesar."""
+    with pytest.raises(ValueError):
+        ImageProcessingUtils.extract_batch_features(sample_images, feature_type, window=window)
+
+def test_batch_shares_single_executor(sample_images):
+    """Distintos valores de max_workers comparten el mismo pool de hilos."""
+    from src.utils import image_processing
+
+    first, _ = ImageProcessingUtils.extract_batch_features(sample_images, "hog", max_workers=1)
+    executor = image_processing._get_executor()
+    second, _ = ImageProcessingUtils.extract_batch_features(sample_images, "hog", max_workers=3)
+
+    assert image_processing._get_executor() is executor
+    assert np.array_equal(first, second)
@@ -0,0 +1,43 @@
+"""
+Pruebas unitarias para el generador de carga.
+"""
+from benchmarks.load_test import (
+    Thresholds,
+    check_thresholds,
+    parse_preprocess,
+    parse_size,
+    parse_weighted,
+)
+
+def test_parse_traffic_mix():
+    """Interpreta tamaños con peso y planes de preprocesamiento."""
+    sizes = parse_weighted("64x64:3,512x256", parse_size)
+    assert [(s.value, s.weight) for s in sizes] == [((64, 64), 3.0), ((512, 256), 1.0)]
+
+    plans = parse_preprocess(";grayscale|2;grayscale,resize_64x64")
+    assert [(p.value, p.weight) for p in plans] == [
+        ([], 1.0),
+        (["grayscale"], 2.0),
+        (["grayscale", "resize_64x64"], 1.0),
+    ]
+
+def test_check_thresholds():
+    """Solo se reportan los umbrales configurados que se superan."""
+    summary = {
+        "rps": 50.0,
+        "error_rate": 0.02,
+        "latency_ms": {"p50": 10.0, "p95": 40.0, "p99": 80.0},
+        "loop_lag_ms": {"max": 5.0},
+        "rss_mb": {"growth": 12.0},
+    }
+
+    assert check_thresholds(summary, Thresholds()) == []
+
+    failures = check_thresholds(summary, Thresholds(
+        min_rps=100.0,
+        max_p95_ms=50.0,
+        max_error_rate=0.01,
+        max_rss_growth_mb=10.0,
+    ))
+    assert len(failures) == 3
+    assert any(failure.startswith("RPS") for failure in failures)
@@ -0,0 +1,94 @@
+"""
+Pruebas unitarias para el transporte local de matrices.
+"""
+import os
+import time
+import pytest
+import numpy as np
+from multiprocessing import shared_memory
+
+from src.services.local_transport import LocalTransportService
+
+@pytest.fixture
+def transport(tmp_path):
+    """Crea un servicio de transporte local sobre un directorio temporal."""
+    service = LocalTransportService(str(tmp_path), ttl=60)
+    yield service
+    service.release_all()
+
+@pytest.fixture
+def sample_matrix():
+    """Matriz de prueba en punto flotante."""
+    return np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+
+def test_publish_shared_memory(transport, sample_matrix):
+    """La matriz publicada en memoria compartida se lee desde su nombre."""
+    handle = transport.publish(sample_matrix, "shm")
+
+    assert handle["shape"] == (2, 3, 4)
+    assert handle["dtype"] == "float32"
+
+    segment = shared_memory.SharedMemory(name=handle["name"])
+    try:
+        view = np.ndarray(handle["shape"], dtype=handle["dtype"], buffer=segment.buf)
+        assert np.array_equal(view, sample_matrix)
+        del view
+    finally:
+        segment.close()
+
+    assert transport.release(handle["name"])
+    assert not transport.release(handle["name"])
+
+def test_publish_memmap(transport, sample_matrix):
+    """La matriz publicada como archivo se abre con np.load en modo mmap."""
+    handle = transport.publish(sample_matrix, "mmap")
+
+    loaded = np.load(handle["path"], mmap_mode="r")
+    assert np.array_equal(loaded, sample_matrix)
+    del loaded
+
+    transport.release(handle["name"])
+    assert not os.path.exists(handle["path"])
+
+def test_cleanup_expired(tmp_path, sample_matrix):
+    """Los recursos con TTL vencido se eliminan."""
+    service = LocalTransportService(str(tmp_path), ttl=0)
+    handle = service.publish(sample_matrix, "mmap")
+
+    assert service.cleanup_expired() == 1
+    assert not os.path.exists(handle["path"])
+
+def test_sweeper_releases_expired(tmp_path, sample_matrix):
+    """El hilo de limpieza libera recursos sin nuevas publicaciones."""
+    service = LocalTransportService(str(tmp_path), ttl=0)
+    handle = service.publish(sample_matrix, "mmap")
+    service.start_sweeper(interval=0.01)
+    try:
+        deadline = time.time() + 2
+        while os.path.exists(handle["path"]) and time.time() < deadline:
+            time.sleep(0.01)
+        assert not os.path.exists(handle["path"])
+    finally:
+        service.release_all()
+
+def test_unsupported_transport(transport, sample_matrix):
+    """Un transporte desconocido produce un error."""
+    with pytest.raises(ValueError):
+        transport.publish(sample_matrix, "socket")
+
+def test_release_from_another_worker(tmp_path, sample_matrix):
+    """Un proceso distinto del que publicó la matriz puede liberarla por nombre."""
+    owner = LocalTransportService(str(tmp_path), ttl=60)
+    other = LocalTransportService(str(tmp_path), ttl=60)
+    try:
+        shm_handle = owner.publish(sample_matrix, "shm")
+        mmap_handle = owner.publish(sample_matrix, "mmap")
+
+        assert other.release(shm_handle["name"])
+        assert other.release(mmap_handle["name"])
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shm_handle["name"])
+        assert not os.path.exists(mmap_handle["path"])
+        assert not other.release("../etc/passwd")
+    finally:
+        owner.release_all()
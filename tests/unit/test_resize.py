@@ -0,0 +1,127 @@
+"""
+Pruebas unitarias para el motor de redimensionamiento.
+"""
+import pytest
+import numpy as np
+from io import BytesIO
+from PIL import Image
+from pydantic import ValidationError
+
+from src.config.settings import Settings
+
+from src.services.image_service import ImageService
+from src.utils.image_processing import ImageProcessingUtils
+from src.utils.resize import ResizeEngine, resize_plan
+
+@pytest.fixture
+def sample_array():
+    """Matriz RGB aleatoria de 128x96."""
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(96, 128, 3), dtype=np.uint8)
+
+@pytest.fixture
+def smooth_array():
+    """Matriz RGB de 128x96 con gradientes suaves."""
+    y, x = np.mgrid[0:96, 0:128]
+    return np.stack([x * 2, y * 2, x + y], axis=-1).clip(0, 255).astype(np.uint8)
+
+@pytest.mark.parametrize("filter_name", ["area", "bilinear", "bicubic", "lanczos"])
+@pytest.mark.parametrize("target", [(50, 30), (32, 24), (200, 150)])
+def test_paths_are_consistent(smooth_array, filter_name, target):
+    """El camino de Pillow y el de matrices aplican el mismo filtro."""
+    from_pil = np.array(ResizeEngine.resize_image(Image.fromarray(smooth_array), target, filter_name))
+    from_array = ImageProcessingUtils.resize_image(smooth_array, target, filter_name)
+
+    assert from_array.shape == (target[1], target[0], 3)
+    assert np.abs(from_pil.astype(np.int32) - from_array).max() <= 2
+
+def test_preprocessing_uses_engine(sample_array):
+    """La operación resize_WxH usa el filtro configurado."""
+    img = ImageService._apply_operation(Image.fromarray(sample_array), "resize_64x48")
+    expected = ResizeEngine.resize_image(Image.fromarray(sample_array), (64, 48), ResizeEngine.default_filter())
+
+    assert np.array_equal(np.array(img), np.array(expected))
+
+@pytest.mark.parametrize("filter_name", ["area", "lanczos"])
+def test_integer_factor_block_average(sample_array, filter_name):
+    """Las reducciones por factor entero de matrices promedian bloques."""
+    plan = resize_plan((128, 96), (32, 24), filter_name)
+    assert plan.block_factors == (4, 4) and plan.exact
+
+    resized = ResizeEngine.resize_array(sample_array, (32, 24), filter_name)
+    expected = sample_array.reshape(24, 4, 32, 4, 3).mean(axis=(1, 3))
+    assert np.abs(resized.astype(np.float32) - expected).max() <= 1
+
+def test_large_downscale_is_prefiltered(sample_array):
+    """Las reducciones grandes con otros filtros no producen aliasing."""
+    plan = resize_plan((128, 96), (50, 30), "lanczos")
+    assert plan.block_factors == (2, 3) and not plan.exact
+
+    # El promedio de ruido uniforme tiende a 127.5; sin prefiltrado la
+    # interpolación solo muestrea píxeles sueltos y conserva su dispersión
+    resized = ResizeEngine.resize_array(sample_array, (16, 12), "lanczos")
+    assert resized.std() < 30
+
+def test_rgba_channels_are_independent():
+    """El canal alfa no premultiplica los canales de color."""
+    rgba = np.zeros((64, 64, 4), dtype=np.uint8)
+    rgba[:, :, :3] = 200
+
+    resized = ResizeEngine.resize_array(rgba, (16, 16), "lanczos")
+    assert np.array_equal(resized[0, 0], [200, 200, 200, 0])
+
+def test_many_channels_and_unsupported_dtypes(sample_array):
+    """Admite más de 4 canales y tipos que OpenCV no redimensiona."""
+    stacked = np.concatenate([sample_array, sample_array[:, :, :2]], axis=2).astype(np.int32)
+    resized = ResizeEngine.resize_array(stacked, (64, 48), "area")
+
+    assert resized.shape == (48, 64, 5)
+    assert resized.dtype == np.int32
+    assert np.array_equal(resized[:, :, 3:], resized[:, :, :2])
+
+def test_single_channel_and_float(sample_array):
+    """Conserva el canal único y admite tipos que Pillow no representa."""
+    single = ResizeEngine.resize_array(sample_array[:, :, :1], (64, 48), "bilinear")
+    assert single.shape == (48, 64, 1)
+
+    floats = ResizeEngine.resize_array(sample_array.astype(np.float64) / 255.0, (64, 48), "area")
+    assert floats.shape == (48, 64, 3)
+    assert floats.dtype == np.float64
+
+def test_unsupported_filter(sample_array):
+    """Un filtro desconocido produce un error."""
+    with pytest.raises(ValueError):
+        ResizeEngine.resize_array(sample_array, (10, 10), "nearest-ish")
+
+def test_resize_filter_setting_is_validated():
+    """RESIZE_FILTER se normaliza a minúsculas y rechaza valores desconocidos."""
+    assert Settings(RESIZE_FILTER="Lanczos").RESIZE_FILTER == "lanczos"
+    with pytest.raises(ValidationError):
+        Settings(RESIZE_FILTER="nearest-ish")
+
+def test_invalid_resize_target_is_not_swallowed(sample_array):
+    """Los errores del motor se propagan en lugar de devolver la imagen intacta."""
+    with pytest.raises(ValueError):
+        ImageService._apply_operation(Image.fromarray(sample_array), "resize_0x10")
+    # Una operación mal formada se sigue ignorando
+    img = ImageService._apply_operation(Image.fromarray(sample_array), "resize_abc")
+    assert img.size == (128, 96)
+
+def test_area_on_16bit_image():
+    """Los modos que Image.reduce no admite usan el filtro BOX."""
+    buffer = BytesIO()
+    Image.fromarray(np.arange(64 * 64, dtype=np.uint16).reshape(64, 64)).save(buffer, "PNG")
+    buffer.seek(0)
+    img = Image.open(buffer)
+    assert img.mode.startswith("I;16")
+
+    resized = ResizeEngine.resize_image(img, (32, 32), "area")
+    assert resized.size == (32, 32)
+
+def test_other_dtypes_match_uint8_path(sample_array):
+    """Los demás tipos de datos usan el mismo filtro que uint8."""
+    as_uint8 = ResizeEngine.resize_array(sample_array, (50, 30), "lanczos")
+    as_uint16 = ResizeEngine.resize_array(sample_array.astype(np.uint16), (50, 30), "lanczos")
+
+    assert as_uint16.dtype == np.uint16
+    assert np.abs(as_uint8.astype(np.int32) - np.clip(as_uint16, 0, 255)).max() <= 1
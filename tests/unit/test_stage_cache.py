@@ -0,0 +1,104 @@
+"""
+Pruebas unitarias para la caché de etapas intermedias.
+"""
+import pytest
+import numpy as np
+from io import BytesIO
+from PIL import Image
+
+from src.services.image_service import ImageService
+from src.services.stage_cache import StageCache
+
+@pytest.fixture
+def sample_image_content():
+    """Crea el contenido de una imagen PNG de muestra."""
+    img = Image.new('RGB', (20, 20), color='green')
+    byte_io = BytesIO()
+    img.save(byte_io, 'PNG')
+    return byte_io.getvalue()
+
+@pytest.fixture
+def stage_cache(monkeypatch):
+    """Sustituye la caché compartida por una instancia vacía."""
+    cache = StageCache(max_bytes=64 * 1024 * 1024)
+    monkeypatch.setattr("src.services.image_service.get_stage_cache", lambda: cache)
+    return cache
+
+@pytest.mark.asyncio
+async def test_resume_from_longest_prefix(sample_image_content, stage_cache):
+    """Un plan nuevo reutiliza la etapa de escala de grises ya calculada."""
+    first = await ImageService.image_to_matrix(BytesIO(sample_image_content), ["grayscale"])
+    second = await ImageService.image_to_matrix(
+        BytesIO(sample_image_content), ["grayscale", "resize_8x8"]
+    )
+
+    assert first.shape == (20, 20)
+    assert second.shape == (8, 8)
+
+    stats = stage_cache.stats()
+    assert stats["stages"]["grayscale"]["hits"] == 1
+    assert stats["stages"]["resize_8x8"]["misses"] == 1
+    # Solo se decodificó la imagen una vez
+    assert stats["stages"]["decode"]["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_cached_result_matches_uncached(sample_image_content, stage_cache):
+    """El resultado obtenido desde la caché coincide con el cálculo directo."""
+    plan = ["grayscale", "resize_5x5"]
+    await ImageService.image_to_matrix(BytesIO(sample_image_content), plan)
+    cached = await ImageService.image_to_matrix(BytesIO(sample_image_content), plan)
+
+    direct = np.array(
+        ImageService._apply_preprocessing(Image.open(BytesIO(sample_image_content)), plan)
+    )
+    assert np.array_equal(cached, direct)
+    assert stage_cache.stats()["stages"]["resize_5x5"]["hits"] == 1
+
+def test_eviction_prefers_cheap_entries():
+    """Al superar el presupuesto se expulsa la entrada con menor coste por byte."""
+    cache = StageCache(max_bytes=250)
+    cheap = Image.new('L', (10, 10))
+    expensive = Image.new('L', (10, 10))
+    cache.put("a", (), cheap, cost=0.001)
+    cache.put("b", (), expensive, cost=1.0)
+    cache.put("c", (), Image.new('L', (10, 10)), cost=0.5)
+
+    assert cache.stats()["bytes"] <= 250
+    assert cache.longest_prefix("a", [])[1] is None
+    assert cache.longest_prefix("b", [])[1] is expensive
+
+@pytest.mark.asyncio
+async def test_cost_accumulates_from_cached_parent(sample_image_content, stage_cache):
+    """Una etapa calculada desde una etapa cacheada suma el coste de su padre."""
+    await ImageService.image_to_matrix(BytesIO(sample_image_content), ["grayscale"])
+    content_hash = next(iter(stage_cache._entries))[0]
+    _, gray, _ = stage_cache.longest_prefix(content_hash, ["grayscale"])
+    stage_cache.put(content_hash, ("grayscale",), gray, cost=10.0)
+
+    await ImageService.image_to_matrix(BytesIO(sample_image_content), ["grayscale", "resize_8x8"])
+
+    _, _, cost = stage_cache.longest_prefix(content_hash, ["grayscale", "resize_8x8"])
+    assert cost >= 10.0
+
+def test_eviction_uses_current_cost_after_reput():
+    """Al reemplazar una entrada, su prioridad anterior deja de aplicarse."""
+    cache = StageCache(max_bytes=250)
+    cache.put("a", (), Image.new('L', (10, 10)), cost=0.001)
+    cache.put("b", (), Image.new('L', (10, 10)), cost=0.5)
+    # "a" pasa a ser la más cara: su elemento anterior en el heap queda obsoleto
+    cache.put("a", (), Image.new('L', (10, 10)), cost=2.0)
+    cache.put("c", (), Image.new('L', (10, 10)), cost=1.0)
+
+    assert cache.longest_prefix("a", [])[1] is not None
+    assert cache.longest_prefix("b", [])[1] is None
+    assert cache.stats()["entries"] == 2
+
+@pytest.mark.asyncio
+async def test_unchanged_stage_not_stored(sample_image_content, stage_cache):
+    """Las operaciones que no modifican la imagen no crean nuevas entradas."""
+    await ImageService.image_to_matrix(
+        BytesIO(sample_image_content), ["grayscale", "unknown", "resize_abc"]
+    )
+
+    prefixes = [prefix for _, prefix in stage_cache._entries]
+    assert sorted(prefixes) == [(), ("grayscale",)]